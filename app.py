@@ -1,21 +1,122 @@
-from flask import Flask, render_template, jsonify, request
+from flask import Flask, Response, render_template, jsonify, request
+from flask.json.provider import JSONProvider
 from flask_cors import CORS
+from collections import OrderedDict
+import hashlib
+import numpy as np
+import orjson
 import os
+import threading
 from dotenv import load_dotenv
 
-# Load environment variables
+# Load environment variables. This must happen before the calculator is
+# imported: set NUMBA_CACHE_DIR (e.g. in .env) to a directory shared by all
+# gunicorn workers so they reuse one set of compiled kernels instead of each
+# compiling their own on startup.
 load_dotenv()
 
+ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY
+
+class ORJSONProvider(JSONProvider):
+    """JSON provider backed by orjson, which also serializes NumPy arrays and scalars"""
+    
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, option=ORJSON_OPTIONS).decode()
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
 # Initialize Flask app
 app = Flask(__name__)
+app.json = ORJSONProvider(app)  # Used by request.json and jsonify
 CORS(app)  # Enable CORS for all routes
 
 # Import ES calculation engine
-from models.es_calculator import ESCalculator
+from models.es_calculator import ESCalculator, warm_up
 
 # Create an instance of the calculator
 calculator = ESCalculator()
 
+# LRU cache of calculator results. Both API endpoints are pure functions of
+# their JSON body, so repeated requests (e.g. from UI sliders) can skip the
+# calculation entirely. The cache is bounded both in entries and in the total
+# size of the NumPy arrays it keeps alive; larger results are not cached.
+RESULT_CACHE_SIZE = 256
+RESULT_CACHE_MAX_BYTES = 32 * 1024 * 1024
+_result_cache = OrderedDict()  # key -> (result, nbytes)
+_result_cache_bytes = 0
+_result_cache_lock = threading.Lock()
+
+def freeze_arrays(value):
+    """Mark the NumPy arrays in a result read-only and return their total size in bytes"""
+    if isinstance(value, np.ndarray):
+        value.setflags(write=False)
+        return value.nbytes
+    if isinstance(value, dict):
+        return sum(freeze_arrays(item) for item in value.values())
+    return 0
+
+def cached_result(endpoint, data, compute):
+    """Return compute(), memoized on the endpoint name and the canonical request body"""
+    global _result_cache_bytes
+    key = hashlib.blake2b(orjson.dumps([endpoint, data], option=orjson.OPT_SORT_KEYS)).digest()
+    
+    with _result_cache_lock:
+        if key in _result_cache:
+            _result_cache.move_to_end(key)
+            return _result_cache[key][0]
+    
+    result = compute()
+    
+    # Every later request gets the same arrays back, so they must not change
+    nbytes = freeze_arrays(result)
+    if nbytes > RESULT_CACHE_MAX_BYTES:
+        return result
+    
+    with _result_cache_lock:
+        if key not in _result_cache:
+            _result_cache[key] = (result, nbytes)
+            _result_cache_bytes += nbytes
+        while len(_result_cache) > RESULT_CACHE_SIZE or _result_cache_bytes > RESULT_CACHE_MAX_BYTES:
+            _, (_, evicted_bytes) = _result_cache.popitem(last=False)
+            _result_cache_bytes -= evicted_bytes
+    
+    return result
+
+STREAM_CHUNK_BYTES = 64 * 1024
+STREAM_BATCH_VALUES = 2048
+
+def json_array_pieces(values):
+    """Yield the JSON encoding of a 1-D array, STREAM_BATCH_VALUES values at a time"""
+    yield b'['
+    for start in range(0, len(values), STREAM_BATCH_VALUES):
+        batch = orjson.dumps(values[start:start + STREAM_BATCH_VALUES], option=ORJSON_OPTIONS)[1:-1]
+        yield (b',' + batch) if start else batch
+    yield b']'
+
+def simulation_pieces(simulation_results):
+    """Yield the /api/simulate response body piece by piece, straight from the result arrays"""
+    yield b'{"success":true,"data":{'
+    for name in ('periods', 'pv_values', 'ev_values'):
+        yield b'"' + name.encode() + b'":'
+        yield from json_array_pieces(simulation_results[name])
+        yield b','
+    yield b'"metrics":{'
+    for i, (name, values) in enumerate(simulation_results['metrics'].items()):
+        yield (b',"' if i else b'"') + name.encode() + b'":'
+        yield from json_array_pieces(values)
+    yield b'}}}'
+
+def stream_simulation(simulation_results):
+    """Yield the /api/simulate response body in chunks of about STREAM_CHUNK_BYTES"""
+    buffer = bytearray()
+    for piece in simulation_pieces(simulation_results):
+        buffer += piece
+        if len(buffer) >= STREAM_CHUNK_BYTES:
+            yield bytes(buffer)
+            buffer.clear()
+    yield bytes(buffer)
+
 @app.route('/')
 def index():
     """Render the main application page"""
@@ -35,13 +136,13 @@ def calculate():
         replan_time = data.get('replan_time', None)
         
         # Calculate ES metrics
-        results = calculator.calculate_metrics(
+        results = cached_result('calculate', data, lambda: calculator.calculate_metrics(
             pv_values=pv_values,
             ev_values=ev_values,
             actual_time=actual_time,
             milestone_duration=milestone_duration,
             replan_time=replan_time
-        )
+        ))
         
         return jsonify({
             'success': True,
@@ -55,7 +156,11 @@ def calculate():
 
 @app.route('/api/simulate', methods=['POST'])
 def simulate():
-    """API endpoint to run a simulation with the AI agent"""
+    """
+    API endpoint to run a simulation with the AI agent.
+    
+    The response is streamed in chunks, with one array per metric.
+    """
     try:
         data = request.json
         
@@ -68,19 +173,16 @@ def simulate():
         scenario = data.get('scenario', 'recovery')  # Options: recovery, slippage, maintain
         
         # Run simulation
-        simulation_results = calculator.run_simulation(
+        simulation_results = cached_result('simulate', data, lambda: calculator.run_simulation(
             initial_pv=initial_pv,
             initial_ev=initial_ev,
             initial_at=initial_at,
             milestone_duration=milestone_duration,
             simulation_steps=simulation_steps,
             scenario=scenario
-        )
+        ))
         
-        return jsonify({
-            'success': True,
-            'data': simulation_results
-        })
+        return Response(stream_simulation(simulation_results), mimetype='application/json')
     except Exception as e:
         return jsonify({
             'success': False,
@@ -90,4 +192,5 @@ def simulate():
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5000))
     debug = os.environ.get('FLASK_ENV', 'development') == 'development'
+    warm_up()
     app.run(host='0.0.0.0', port=port, debug=debug)
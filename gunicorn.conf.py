@@ -0,0 +1,11 @@
+# gunicorn loads this file automatically when started from the project root.
+# Load .env here too: post_fork imports the calculator (and Numba) before the
+# worker imports app.py, and Numba only reads NUMBA_CACHE_DIR on import.
+from dotenv import load_dotenv
+
+load_dotenv()
+
+def post_fork(server, worker):
+    """Warm the ES kernels in each worker, after the fork"""
+    from models.es_calculator import warm_up
+    warm_up()
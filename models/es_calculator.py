@@ -1,5 +1,185 @@
 import numpy as np
-import pandas as pd
+
+try:
+    from numba import njit, vectorize
+except ImportError:  # Numba is optional; fall back to plain Python kernels
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+    
+    def vectorize(*args, **kwargs):
+        return lambda func: np.vectorize(func, otypes=[np.float64])
+
+# Simulation scenarios, encoded as integers so the kernels stay in nopython mode
+_RECOVERY, _SLIPPAGE, _MAINTAIN = 0, 1, 2
+
+# fastmath flags for the simulation kernel. 'nnan' and 'ninf' are left out
+# because IEAC(t) and TSPI are legitimately infinite for some inputs, and
+# 'contract'/'reassoc' because they perturb the EV recurrence in the last
+# bits, which moves ES across the steps of flat PV segments.
+_FASTMATH = {'nsz', 'arcp', 'afn'}
+
+
+@njit('float64(float64, float64[::1], int64)', cache=True)
+def _interpolate_es(ev_cum, pv_cum, C):
+    """Earned Schedule from the last period index C where PV_cum[C] <= EV_cum (-1 if none)."""
+    # If EV is less than the first period's PV
+    if C < 0:
+        return 0.0
+        
+    # If EV is exactly at a planned point or at the last point
+    if C == pv_cum.shape[0] - 1 or abs(pv_cum[C] - ev_cum) < 1e-9:
+        return float(C + 1)  # +1 because periods typically start at 1, not 0
+    
+    # Calculate fractional part using interpolation
+    PV_C = pv_cum[C]
+    PV_next = pv_cum[C + 1]
+    
+    # Avoid division by zero
+    if PV_next - PV_C < 1e-9:
+        I = 0.0
+    else:
+        I = (ev_cum - PV_C) / (PV_next - PV_C)
+    
+    # ES = C + I (with period adjustment)
+    return (C + 1) + I  # +1 because periods typically start at 1, not 0
+
+
+@njit('float64(float64, float64[::1])', cache=True)
+def _es_kernel(ev_cum, pv_cum):
+    """Earned Schedule kernel for a float64 cumulative PV array (see ESCalculator.calculate_earned_schedule)."""
+    # Find the last period index C where PV_cum[C] <= EV_cum. PV_cum is a
+    # cumulative (non-decreasing) curve, so a binary search is sufficient.
+    # C == -1 means EV is less than the first period's PV.
+    C = np.searchsorted(pv_cum, ev_cum, side='right') - 1
+    return _interpolate_es(ev_cum, pv_cum, C)
+
+
+@vectorize(['float64(float64, float64)'], cache=True)
+def _ieac_t(spi_t, md):
+    """Forecast milestone completion IEAC(t)_M = MD / SPI(t), infinite if SPI(t) is zero"""
+    return md / spi_t if spi_t > 0 else np.inf
+
+
+@vectorize(['float64(float64, float64, float64)'], cache=True)
+def _tspi(es, actual_time, md):
+    """To-Complete SPI for the milestone, infinite if the milestone is due now"""
+    return np.inf if md == actual_time else (md - es) / (md - actual_time)
+
+
+@njit(inline='always')
+def _simulate_kernel(pv, ev0, initial_at, md, steps, scenario_code, initial_spi_t):
+    """
+    Simulation kernel behind ESCalculator.run_simulation.
+    
+    Always inlined into one of the per-scenario kernels below, where
+    scenario_code is a constant and the scenario branch is folded away.
+    
+    Returns preallocated arrays (pv_out, ev_out, ES, SV_t, SPI_t, IEAC, FSV, TSPI)
+    with one entry per simulated period.
+    """
+    n = pv.shape[0]
+    periods = np.arange(initial_at + 1, initial_at + steps + 1)
+    last = np.minimum(periods, n - 1)  # last PV index visible in each period
+    
+    # PV for each simulated period, and for the period before it
+    pv_out = np.where(periods < n, pv[last], pv[n - 1] * 1.1)
+    pv_prev = pv[periods - 1]
+    
+    # Target SPI(t) for each period based on scenario
+    k = np.arange(1, steps + 1).astype(np.float64)
+    if scenario_code == _RECOVERY:
+        # Gradually improve performance
+        target_spi_t = np.minimum(1.0, initial_spi_t + 0.05 * k)
+    elif scenario_code == _SLIPPAGE:
+        # Gradually worsen performance
+        target_spi_t = np.maximum(0.7, initial_spi_t - 0.03 * k)
+    else:
+        # Maintain current performance
+        target_spi_t = np.full(steps, initial_spi_t)
+    ev_increment = target_spi_t * (pv_out - pv_prev)
+    
+    # Ensure EV doesn't exceed PV unrealistically. The cap feeds back into
+    # the next step, so this part of the recurrence can't be a plain cumsum.
+    ev_cap = pv_out * 1.1
+    ev_out = np.empty(steps)
+    current_ev = ev0
+    for step in range(steps):
+        current_ev = min(current_ev + ev_increment[step], ev_cap[step])
+        ev_out[step] = current_ev
+    
+    # Last period index C where PV_cum[C] <= EV_cum, searched for all periods
+    # at once and clamped to the part of the PV curve each period can see
+    bracket = np.minimum(np.searchsorted(pv, ev_out, side='right') - 1, last)
+    
+    # ES for each period only depends on that period's EV and bracket
+    ES = np.empty(steps)
+    for step in range(steps):
+        ES[step] = _interpolate_es(ev_out[step], pv[:last[step] + 1], bracket[step])
+    
+    # Derived metrics over the whole period axis (AT >= 1 for every simulated
+    # period); the ufuncs handle the infinite forecasts element-wise
+    actual_time = periods.astype(np.float64)
+    SV_t = ES - actual_time
+    SPI_t = ES / actual_time
+    IEAC = _ieac_t(SPI_t, md)
+    FSV = md - IEAC
+    TSPI = _tspi(ES, actual_time, md)
+    
+    return pv_out, ev_out, ES, SV_t, SPI_t, IEAC, FSV, TSPI
+
+
+@njit(cache=True, fastmath=_FASTMATH)
+def _sim_recovery(pv, ev0, initial_at, md, steps, initial_spi_t):
+    """Simulation kernel for the 'recovery' scenario."""
+    return _simulate_kernel(pv, ev0, initial_at, md, steps, _RECOVERY, initial_spi_t)
+
+
+@njit(cache=True, fastmath=_FASTMATH)
+def _sim_slippage(pv, ev0, initial_at, md, steps, initial_spi_t):
+    """Simulation kernel for the 'slippage' scenario."""
+    return _simulate_kernel(pv, ev0, initial_at, md, steps, _SLIPPAGE, initial_spi_t)
+
+
+@njit(cache=True, fastmath=_FASTMATH)
+def _sim_maintain(pv, ev0, initial_at, md, steps, initial_spi_t):
+    """Simulation kernel for the 'maintain' scenario."""
+    return _simulate_kernel(pv, ev0, initial_at, md, steps, _MAINTAIN, initial_spi_t)
+
+
+# Unknown scenarios fall back to 'maintain'
+_SCENARIO_KERNELS = {'recovery': _sim_recovery, 'slippage': _sim_slippage, 'maintain': _sim_maintain}
+
+
+def warm_up():
+    """
+    Compile (or load from the on-disk cache) and run every kernel once.
+    
+    Call this once per worker process so the first request doesn't pay for
+    compiling the kernels.
+    """
+    _es_kernel(0.0, np.zeros(2))
+    for kernel in _SCENARIO_KERNELS.values():
+        kernel(np.zeros(2), 0.0, 0, 2.0, 1, 1.0)
+
+
+def _as_float_array(values, name, cumulative=False):
+    """
+    Validate an input series before it reaches the numeric kernels.
+    
+    Returns values as a C-contiguous float64 array (no copy if it already is
+    one), as the kernel signatures require. Raises ValueError for anything
+    that isn't a one-dimensional numeric series, or, with cumulative=True,
+    a series that decreases.
+    """
+    values = np.ascontiguousarray(values, dtype=np.float64)
+    if values.ndim != 1:
+        raise ValueError(f'{name} must be a one-dimensional list of values')
+    if cumulative and not np.all(np.diff(values) >= 0):
+        raise ValueError(f'{name} must be cumulative (non-decreasing)')
+    return values
+
 
 class ESCalculator:
     """Earned Schedule calculator class that implements ES formulas and algorithms"""
@@ -8,64 +188,45 @@ class ESCalculator:
         """Initialize the calculator"""
         pass
     
-    def calculate_earned_schedule(self, ev_cum, pv_cum):
+    def calculate_earned_schedule(self, ev_cum, pv_cum, lo=0, hi=None):
         """
         Calculate Earned Schedule (ES) using interpolation.
         
         Args:
             ev_cum (float): Cumulative Earned Value at current time
-            pv_cum (list): List of cumulative Planned Values for each period
+            pv_cum (np.ndarray): Cumulative Planned Values for each period
+            lo (int, optional): First period of pv_cum to use
+            hi (int, optional): End (exclusive) of the periods to use, defaults to all
             
         Returns:
-            float: Earned Schedule value
+            float: Earned Schedule value for the periods pv_cum[lo:hi]
         """
-        # Find the last period index C where PV_cum[C] <= EV_cum
-        C = None
-        for i in range(len(pv_cum)):
-            if pv_cum[i] > ev_cum:
-                C = i - 1
-                break
-            elif i == len(pv_cum) - 1:  # Handle case where EV >= last PV
-                C = i
-        
-        # If EV is less than the first period's PV
-        if C is None or C < 0:
-            return 0
-            
-        # If EV is exactly at a planned point or at the last point
-        if C == len(pv_cum) - 1 or abs(pv_cum[C] - ev_cum) < 1e-9:
-            return C + 1  # +1 because periods typically start at 1, not 0
-        
-        # Calculate fractional part using interpolation
-        PV_C = pv_cum[C]
-        PV_next = pv_cum[C + 1]
-        
-        # Avoid division by zero
-        if PV_next - PV_C < 1e-9:
-            I = 0
-        else:
-            I = (ev_cum - PV_C) / (PV_next - PV_C)
-        
-        # ES = C + I (with period adjustment)
-        return (C + 1) + I  # +1 because periods typically start at 1, not 0
+        # pv_cum[lo:hi] is a contiguous view, so no copy is made here
+        pv_cum = np.ascontiguousarray(pv_cum, dtype=np.float64)
+        return float(_es_kernel(float(ev_cum), pv_cum[lo:hi]))
     
     def calculate_metrics(self, pv_values, ev_values, actual_time, milestone_duration=None, replan_time=None):
         """
         Calculate all ES metrics based on input data.
         
         Args:
-            pv_values (list): List of cumulative PV values
-            ev_values (list): List of cumulative EV values
+            pv_values (array-like): Cumulative PV values (ndarrays are used without copying)
+            ev_values (array-like): Cumulative EV values (ndarrays are used without copying)
             actual_time (int): Current time period (AT)
             milestone_duration (float, optional): Planned duration to milestone (MD)
             replan_time (int, optional): Time at which re-planning occurred
             
         Returns:
             dict: Dictionary containing all calculated metrics
+            
+        Raises:
+            ValueError: If the inputs are not numeric series, PV is not cumulative or EV is empty
         """
-        # Convert inputs to numpy arrays
-        pv_cum = np.array(pv_values, dtype=float)
-        ev_cum = np.array(ev_values, dtype=float)
+        # Validate inputs before doing any work (no copy for float64 ndarrays)
+        pv_cum = _as_float_array(pv_values, 'pv_values', cumulative=True)
+        ev_cum = _as_float_array(ev_values, 'ev_values')
+        if len(ev_cum) == 0:
+            raise ValueError('ev_values must contain at least one value')
         
         # Calculate Earned Schedule
         ES = self.calculate_earned_schedule(ev_cum[-1], pv_cum)
@@ -124,11 +285,10 @@ class ESCalculator:
             else:
                 # Calculate ES for the remaining portion
                 post_replan_ev = ev_cum[replan_time:]
-                post_replan_pv = pv_cum[replan_time:]
                 post_replan_at = actual_time - replan_time
                 
                 if post_replan_at > 0:
-                    ES_rem = self.calculate_earned_schedule(post_replan_ev[-1], post_replan_pv)
+                    ES_rem = self.calculate_earned_schedule(post_replan_ev[-1], pv_cum, replan_time, len(pv_cum))
                     SPI_t_rem = ES_rem / post_replan_at
                 else:
                     SPI_t_rem = 1.0
@@ -154,47 +314,68 @@ class ESCalculator:
         Run a simulation to forecast future project performance.
         
         Args:
-            initial_pv (list): Initial planned value curve
-            initial_ev (list): Initial earned value curve
+            initial_pv (array-like): Initial cumulative planned value curve
+            initial_ev (array-like): Initial cumulative earned value curve
             initial_at (int): Current actual time
             milestone_duration (float): Planned duration to milestone
             simulation_steps (int): Number of steps to simulate
             scenario (str): Simulation scenario (recovery, slippage, maintain)
             
         Returns:
-            dict: Simulation results with metrics at each step
+            dict: Simulation results; periods, PV and EV values, and a dict of metric
+                arrays, each with one entry per simulated period. Metric values are
+                float32.
+            
+        Raises:
+            ValueError: If the inputs are not numeric series, PV is not cumulative or
+                initial_at lies beyond the PV curve
         """
-        # Initialize arrays for simulation
-        pv_values = np.array(initial_pv, dtype=float)
-        ev_values = np.array(initial_ev, dtype=float)
-        
-        # Extend arrays if needed for simulation steps
-        if len(pv_values) < initial_at + simulation_steps:
-            # Extend PV assuming linear growth for remaining periods
-            if len(pv_values) > 1:
-                avg_increment = (pv_values[-1] - pv_values[0]) / (len(pv_values) - 1)
-                extension = [pv_values[-1] + avg_increment * (i+1) for i in range(simulation_steps)]
-                pv_values = np.append(pv_values, extension)
+        steps = max(int(simulation_steps), 0)
+        initial_pv = _as_float_array(initial_pv, 'initial_pv', cumulative=True)
+        initial_ev = _as_float_array(initial_ev, 'initial_ev')
+        pv_len = len(initial_pv)
+        if pv_len == 0:
+            raise ValueError('initial_pv must contain at least one value')
+        
+        # Every simulated period needs the PV of the period before it
+        if pv_len < initial_at:
+            raise ValueError('initial_at lies beyond the end of the planned value curve')
+        
+        # Preallocate the PV buffer, with room for one extra period per step
+        # if the plan has to be extended to cover the simulation
+        extension_len = steps if pv_len < initial_at + steps else 0
+        pv_values = np.empty(pv_len + extension_len)
+        pv_values[:pv_len] = initial_pv
+        
+        # Write the extension straight into the tail of the buffer
+        if extension_len:
+            extension = pv_values[pv_len:]
+            offsets = np.arange(1, steps + 1, dtype=float)
+            if pv_len > 1:
+                # Extend PV assuming linear growth for remaining periods
+                avg_increment = (pv_values[pv_len - 1] - pv_values[0]) / (pv_len - 1)
+                np.multiply(avg_increment, offsets, out=extension)
+                extension += pv_values[pv_len - 1]
             else:
                 # If only one PV value, assume constant increment
-                extension = [pv_values[-1] * (1 + 0.1 * (i+1)) for i in range(simulation_steps)]
-                pv_values = np.append(pv_values, extension)
-        
-        # Initialize results container
-        simulation_results = {
-            'periods': list(range(initial_at + 1, initial_at + simulation_steps + 1)),
-            'pv_values': [],
-            'ev_values': [],
-            'metrics': []
-        }
+                np.multiply(0.1, offsets, out=extension)
+                extension += 1
+                extension *= pv_values[0]
+        
+        # The EV buffer holds one extra slot for the current EV so it never
+        # has to be grown with np.append
+        ev_len = len(initial_ev)
+        ev_values = np.empty(ev_len + 1)
+        ev_values[:ev_len] = initial_ev
         
         # Current EV at initial time
-        current_ev = ev_values[-1] if len(ev_values) > 0 else 0
+        current_ev = ev_values[ev_len - 1] if ev_len > 0 else 0
+        ev_values[ev_len] = current_ev
         
         # Calculate initial metrics
         initial_metrics = self.calculate_metrics(
-            pv_values=pv_values[:initial_at + 1].tolist(),
-            ev_values=np.append(ev_values, current_ev).tolist(),
+            pv_values=pv_values[:initial_at + 1],
+            ev_values=ev_values,
             actual_time=initial_at,
             milestone_duration=milestone_duration
         )
@@ -202,44 +383,41 @@ class ESCalculator:
         # Initial SPI(t)
         initial_spi_t = initial_metrics['SPI_t']
         
-        # Simulate future periods
-        for step in range(simulation_steps):
-            current_period = initial_at + step + 1
-            current_pv = pv_values[current_period] if current_period < len(pv_values) else pv_values[-1] * 1.1
-            
-            # Determine EV growth based on scenario
-            if scenario == 'recovery':
-                # Gradually improve performance
-                target_spi_t = min(1.0, initial_spi_t + 0.05 * (step + 1))
-                ev_increment = target_spi_t * (current_pv - pv_values[current_period - 1])
-            elif scenario == 'slippage':
-                # Gradually worsen performance
-                target_spi_t = max(0.7, initial_spi_t - 0.03 * (step + 1))
-                ev_increment = target_spi_t * (current_pv - pv_values[current_period - 1])
-            else:  # maintain
-                # Maintain current performance
-                ev_increment = initial_spi_t * (current_pv - pv_values[current_period - 1])
-            
-            # Update current EV
-            current_ev += ev_increment
-            
-            # Ensure EV doesn't exceed PV unrealistically
-            current_ev = min(current_ev, current_pv * 1.1)
-            
-            # Add to simulation arrays
-            ev_extended = np.append(ev_values, current_ev)
-            
-            # Calculate metrics for this period
-            period_metrics = self.calculate_metrics(
-                pv_values=pv_values[:current_period + 1].tolist(),
-                ev_values=ev_extended.tolist(),
-                actual_time=current_period,
-                milestone_duration=milestone_duration
+        # Pick the kernel specialized for the scenario
+        simulate_kernel = _SCENARIO_KERNELS.get(scenario, _sim_maintain)
+        
+        # Simulate future periods. Without a milestone MD is NaN; keep NumPy
+        # from warning about the (discarded) milestone metrics when the
+        # kernels run without Numba.
+        with np.errstate(divide='ignore', invalid='ignore'):
+            simulated = simulate_kernel(
+                pv_values,
+                float(current_ev),
+                int(initial_at),
+                np.nan if milestone_duration is None else float(milestone_duration),
+                steps,
+                float(initial_spi_t)
             )
-            
-            # Store results
-            simulation_results['pv_values'].append(float(current_pv))
-            simulation_results['ev_values'].append(float(current_ev))
-            simulation_results['metrics'].append(period_metrics)
         
-        return simulation_results
+        # The summary metrics are only displayed, so hand float32 copies to
+        # the JSON encoder; PV and EV are money amounts and stay float64
+        pv_out, ev_out = simulated[:2]
+        ES, SV_t, SPI_t, IEAC_t_M, F_SV_t, TSPI_M = (
+            np.ascontiguousarray(values, dtype=np.float32) for values in simulated[2:]
+        )
+        
+        # Metrics are returned column-wise, one array per metric
+        metrics = {'ES': ES, 'SV_t': SV_t, 'SPI_t': SPI_t}
+        if milestone_duration is not None:
+            metrics.update({
+                'IEAC_t_M': IEAC_t_M,
+                'F_SV_t': F_SV_t,
+                'TSPI_M': TSPI_M
+            })
+        
+        return {
+            'periods': np.arange(initial_at + 1, initial_at + steps + 1),
+            'pv_values': pv_out,
+            'ev_values': ev_out,
+            'metrics': metrics
+        }
@@ -0,0 +1,183 @@
+"""
+Regression tests for the ES calculator.
+
+Expected values were produced by the original pure-Python implementation
+(the step-by-step simulation loop and linear ES search) for the same inputs.
+"""
+import importlib.util
+import math
+import os
+import sys
+import unittest
+from unittest import mock
+
+import numpy as np
+from numpy.testing import assert_allclose
+
+from models.es_calculator import ESCalculator
+
+INF = math.inf
+
+# (run_simulation kwargs, expected periods, PV, EV and metric columns)
+SIMULATION_CASES = {
+    'flat_pv_segments': (
+        dict(initial_pv=[0.0, 0.0, 20.0, 40.0, 40.0, 60.0, 80.0, 80.0], initial_ev=[0.0, 0.0, 18.0, 40.0],
+             initial_at=3, milestone_duration=7.0, simulation_steps=4, scenario='maintain'),
+        [4, 5, 6, 7], [40.0, 60.0, 80.0, 80.0], [40.0, 66.0, 88.0, 88.0],
+        {
+            'ES': [5.0, 6.0, 7.0, 8.0],
+            'SV_t': [1.0, 1.0, 1.0, 1.0],
+            'SPI_t': [1.25, 1.2, 1.1666666666666667, 1.1428571428571428],
+            'IEAC_t_M': [5.6, 5.833333333333334, 6.0, 6.125],
+            'F_SV_t': [1.4000000000000004, 1.166666666666666, 1.0, 0.875],
+            'TSPI_M': [0.6666666666666666, 0.5, 0.0, INF],
+        },
+    ),
+    'single_value_pv_extension': (
+        dict(initial_pv=[50.0], initial_ev=[40.0], initial_at=0, milestone_duration=3.0,
+             simulation_steps=3, scenario='recovery'),
+        [1, 2, 3], [55.00000000000001, 60.0, 65.0], [45.00000000000001, 50.0, 55.0],
+        {
+            'ES': [0.0, 1.0, 1.9999999999999987],
+            'SV_t': [-1.0, -1.0, -1.0000000000000013],
+            'SPI_t': [0.0, 0.5, 0.6666666666666662],
+            'IEAC_t_M': [INF, 6.0, 4.5000000000000036],
+            'F_SV_t': [-INF, -3.0, -1.5000000000000036],
+            'TSPI_M': [1.5, 2.0, INF],
+        },
+    ),
+    'linear_pv_extension': (
+        dict(initial_pv=[10.0, 20.0, 30.0], initial_ev=[8.0, 15.0], initial_at=2, milestone_duration=4.0,
+             simulation_steps=4, scenario='slippage'),
+        [3, 4, 5, 6], [40.0, 50.0, 60.0, 70.0], [22.2, 29.2, 36.2, 43.2],
+        {
+            'ES': [2.2199999999999998, 2.92, 3.62, 4.32],
+            'SV_t': [-0.7800000000000002, -1.08, -1.38, -1.6799999999999997],
+            'SPI_t': [0.7399999999999999, 0.73, 0.724, 0.7200000000000001],
+            'IEAC_t_M': [5.405405405405406, 5.47945205479452, 5.524861878453039, 5.5555555555555545],
+            'F_SV_t': [-1.4054054054054061, -1.4794520547945202, -1.5248618784530388, -1.5555555555555545],
+            'TSPI_M': [1.7800000000000002, INF, -0.3799999999999999, 0.16000000000000014],
+        },
+    ),
+    'no_milestone': (
+        dict(initial_pv=[10.0, 20.0, 30.0, 40.0, 50.0], initial_ev=[8.0, 15.0, 25.0], initial_at=2,
+             milestone_duration=None, simulation_steps=2, scenario='recovery'),
+        [3, 4], [40.0, 50.0], [35.0, 45.0],
+        {
+            'ES': [3.5, 4.5],
+            'SV_t': [0.5, 0.5],
+            'SPI_t': [1.1666666666666667, 1.125],
+        },
+    ),
+    'zero_steps': (
+        dict(initial_pv=[10.0, 20.0, 30.0], initial_ev=[8.0, 15.0], initial_at=2, milestone_duration=4.0,
+             simulation_steps=0, scenario='recovery'),
+        [], [], [],
+        {name: [] for name in ('ES', 'SV_t', 'SPI_t', 'IEAC_t_M', 'F_SV_t', 'TSPI_M')},
+    ),
+}
+
+
+def load_without_numba():
+    """Import a fresh copy of the calculator module with Numba unavailable"""
+    path = os.path.join(os.path.dirname(__file__), os.pardir, 'models', 'es_calculator.py')
+    spec = importlib.util.spec_from_file_location('es_calculator_without_numba', path)
+    module = importlib.util.module_from_spec(spec)
+    with mock.patch.dict(sys.modules, {'numba': None, spec.name: module}):
+        spec.loader.exec_module(module)
+    return module
+
+
+class RunSimulationTest(unittest.TestCase):
+    
+    calculator_class = ESCalculator
+    
+    def assert_simulation(self, case):
+        kwargs, periods, pv_values, ev_values, metrics = SIMULATION_CASES[case]
+        results = self.calculator_class().run_simulation(**kwargs)
+        
+        self.assertEqual(list(results['periods']), periods)
+        assert_allclose(results['pv_values'], pv_values, rtol=1e-12)
+        assert_allclose(results['ev_values'], ev_values, rtol=1e-12)
+        self.assertEqual(set(results['metrics']), set(metrics))
+        for name, expected in metrics.items():
+            # Metrics are returned as float32
+            assert_allclose(results['metrics'][name], expected, rtol=1e-6, atol=1e-6, err_msg=name)
+    
+    def test_flat_pv_segments(self):
+        self.assert_simulation('flat_pv_segments')
+    
+    def test_single_value_pv_extension(self):
+        self.assert_simulation('single_value_pv_extension')
+    
+    def test_linear_pv_extension(self):
+        self.assert_simulation('linear_pv_extension')
+    
+    def test_no_milestone(self):
+        self.assert_simulation('no_milestone')
+    
+    def test_zero_steps(self):
+        self.assert_simulation('zero_steps')
+    
+    def test_initial_at_beyond_pv_curve(self):
+        with self.assertRaises(ValueError):
+            self.calculator_class().run_simulation([10.0, 20.0], [5.0], 4, 4.0, simulation_steps=2)
+
+
+class RunSimulationWithoutNumbaTest(RunSimulationTest):
+    
+    @classmethod
+    def setUpClass(cls):
+        module = load_without_numba()
+        assert not hasattr(module._es_kernel, 'py_func'), 'kernels were compiled with Numba'
+        cls.calculator_class = module.ESCalculator
+
+
+class CalculateMetricsTest(unittest.TestCase):
+    
+    def test_flat_pv_segments(self):
+        results = ESCalculator().calculate_metrics(
+            [0.0, 0.0, 20.0, 40.0, 40.0, 60.0], [10.0, 40.0], actual_time=3, milestone_duration=6.0
+        )
+        
+        expected = {
+            'ES': 5.0,
+            'SV_t': 2.0,
+            'SPI_t': 1.6666666666666667,
+            'IEAC_t_M': 3.5999999999999996,
+            'F_SV_t': 2.4000000000000004,
+            'TSPI_M': 0.3333333333333333,
+        }
+        self.assertEqual(set(results), set(expected))
+        for name, value in expected.items():
+            self.assertAlmostEqual(results[name], value, places=12, msg=name)
+    
+    def test_replan(self):
+        results = ESCalculator().calculate_metrics(
+            [10.0, 20.0, 30.0, 40.0, 50.0], [8.0, 15.0, 25.0, 31.0],
+            actual_time=4, milestone_duration=5.0, replan_time=2
+        )
+        
+        expected = {
+            'ES': 3.1,
+            'SV_t': -0.8999999999999999,
+            'SPI_t': 0.775,
+            'IEAC_t_M': 6.451612903225806,
+            'F_SV_t': -1.451612903225806,
+            'TSPI_M': 1.9,
+            'D_pre': 2,
+            'PD_rem': 3,
+            'SPI_t_rem': 0.55,
+            'IEAC_t_RP': 7.454545454545454,
+        }
+        self.assertEqual(set(results), set(expected))
+        for name, value in expected.items():
+            self.assertAlmostEqual(results[name], value, places=12, msg=name)
+    
+    def test_rejects_decreasing_pv(self):
+        with self.assertRaises(ValueError):
+            ESCalculator().calculate_metrics([10.0, 5.0], [4.0], actual_time=1)
+
+
+if __name__ == '__main__':
+    unittest.main()